@@ -1,195 +1,403 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from stats_io import detect_age_col, read_stats
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; top_positions falls back to numpy
+    njit = None
+
+
+# Define metric groups inspired by Opta layouts
+METRIC_GROUPS = {
+    "Attacking": [
+        ("goals", False),
+        ("assists", False),
+        ("totalShots", False),
+        ("shotsOnTarget", False),
+        ("expectedGoals", False),
+    ],
+    "Possession & Passing": [
+        ("accuratePassesPercentage", True),
+        ("keyPasses", False),
+        ("accurateFinalThirdPasses", False),
+        ("accurateLongBallsPercentage", True),
+    ],
+    "Defending": [
+        ("tackles", False),
+        ("interceptions", False),
+        ("clearances", False),
+        ("groundDuelsWon", False),
+        ("groundDuelsWonPercentage", True),
+        ("totalDuelsWon", False),
+        ("totalDuelsWonPercentage", True),
+    ],
+}
+
+# Columns the dashboard actually uses; everything else is skipped at read time
+NEEDED_COLS = frozenset(
+    ["player", "team", "country", "age", "age_x", "age_y", "minutesPlayed"]
+    + [metric for group_metrics in METRIC_GROUPS.values() for metric, _ in group_metrics]
+)
+
+# Pretty display names for the non-metric columns of a top 10 table
+DISPLAY_NAMES = {
+    "age": "Age",
+    "age_x": "Age",
+    "age_y": "Age",
+    "country": "Country",
+}
 
-@st.cache_data
-def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
 
-    # Basic cleaning: ensure numeric columns are numeric
-    for col in df.columns:
-        if col not in ["player", "team", "country"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+@st.cache_data
+def load_data(path: str) -> tuple[pd.DataFrame, str | None, int]:
+    df = read_stats(path, columns=NEEDED_COLS)
 
     # Derive some helper columns
     if "minutesPlayed" in df.columns:
         df["90s"] = df["minutesPlayed"] / 90.0
 
-    return df
+        # Per 90 versions of every count metric, so the per 90 toggle is a
+        # column lookup rather than a division on each rerun
+        for group_metrics in METRIC_GROUPS.values():
+            for metric, is_percentage in group_metrics:
+                if not is_percentage and metric in df.columns:
+                    df[f"{metric}_per90"] = df[metric] / df["90s"]
+
+    minutes_max = int(df["minutesPlayed"].max()) if "minutesPlayed" in df.columns else 0
+
+    return df, detect_age_col(df), minutes_max
+
+
+def format_column(col: pd.Series) -> pd.Series:
+    """
+    Format a numeric column for display. The format is picked once per column:
+    no decimals if it holds only whole numbers, otherwise 2 decimals.
+    Missing values become empty strings.
+    """
+    values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(values)
 
+    if pd.api.types.is_integer_dtype(col) or np.all(values[valid] % 1 == 0):
+        text = np.char.mod("%.0f", values)
+    else:
+        text = np.char.mod("%.2f", values)
+
+    return pd.Series(np.where(valid, text, ""), index=col.index)
+
+
+if njit is not None:
+
+    # nogil rather than parallel=True: Streamlit runs every session on its own
+    # thread, and Numba's default threading layer can't take concurrent
+    # parallel launches. Releasing the GIL still lets sessions run side by side.
+    @njit(nogil=True, cache=True)
+    def _topk_cols(mat, k):
+        # Per column, keep the k best rows in a small array sorted highest
+        # first, updated by insertion (NaN ranks as -inf)
+        n, m = mat.shape
+        out = np.empty((k, m), dtype=np.intp)
+        for j in range(m):
+            vals = np.empty(k, dtype=np.float64)
+            rows = np.empty(k, dtype=np.intp)
+            count = 0
+            for i in range(n):
+                v = mat[i, j]
+                if np.isnan(v):
+                    v = -np.inf
+                if count < k:
+                    p = count
+                    count += 1
+                elif v > vals[k - 1]:
+                    p = k - 1
+                else:
+                    continue
+                # Strict comparison, so tied rows keep their row order
+                while p > 0 and vals[p - 1] < v:
+                    vals[p] = vals[p - 1]
+                    rows[p] = rows[p - 1]
+                    p -= 1
+                vals[p] = v
+                rows[p] = i
+            out[:, j] = rows
+        return out
+
+else:
+    _topk_cols = None
+
+
+def _top_positions_numpy(block: np.ndarray, k: int) -> np.ndarray:
+    # Stable sort, so tied rows keep their row order like _topk_cols; a full
+    # sort is cheap at this table size
+    keys = np.where(np.isnan(block), -np.inf, block)
+    return np.argsort(-keys, axis=0, kind="stable")[:k]
+
+
+def top_positions(block: np.ndarray, k: int = 10) -> np.ndarray:
+    """
+    Row positions of the k largest values in every column of a 2D block,
+    ordered highest first. Missing values rank last and ties keep row order.
+    """
+    k = min(k, block.shape[0])
+    if k == 0:
+        return np.empty((0, block.shape[1]), dtype=np.intp)
 
-def format_number(val):
-    if pd.isna(val):
-        return ""
-    if isinstance(val, (int, float)):
-        # Show integers without decimals, others with 2 decimals
-        if float(val).is_integer():
-            return f"{int(val)}"
-        return f"{val:.2f}"
-    return str(val)
+    if _topk_cols is not None:
+        return _topk_cols(block, k)
+    return _top_positions_numpy(block, k)
 
 
 def build_top_table(
     df: pd.DataFrame,
     metric: str,
-    per_90: bool = False,
-    min_minutes: int = 0,
-    ascending: bool = False,
+    metric_col: str,
+    rows: np.ndarray,
     extra_cols: list[str] | None = None,
 ) -> pd.DataFrame:
-    work = df.copy()
-
-    # Filter by minutes played if available
-    if "minutesPlayed" in work.columns and min_minutes > 0:
-        work = work[work["minutesPlayed"] >= min_minutes]
-
-    # Calculate per 90 if requested and minutes column exists
-    metric_col = metric
-    if per_90 and "minutesPlayed" in work.columns:
-        metric_per90 = f"{metric}_per90"
-        work[metric_per90] = work[metric] / (work["minutesPlayed"] / 90.0)
-        metric_col = metric_per90
-
-    # Sort and take top 10
-    work = work.sort_values(metric_col, ascending=ascending).head(10)
-
-    # Build display table
+    # Build display table from the selected rows only
     display_cols = ["player", "team", metric_col]
     if extra_cols:
         display_cols.extend(extra_cols)
 
-    display = work[display_cols].copy()
+    # Rows with a missing metric rank last and stay in as blank cells, like
+    # the original sort_values().head(10)
+    display = df.iloc[rows][display_cols]
     display.insert(0, "Rk", range(1, len(display) + 1))
 
-    # Rename metric column for pretty display
+    # Rename metric, age and country columns for pretty display in one pass
     pretty_name = metric.replace("_", " ").title()
-    display = display.rename(columns={metric_col: pretty_name})
-    
-    # Rename age and country columns for pretty display
-    if "age" in display.columns:
-        display = display.rename(columns={"age": "Age"})
-    if "age_x" in display.columns:
-        display = display.rename(columns={"age_x": "Age"})
-    if "age_y" in display.columns:
-        display = display.rename(columns={"age_y": "Age"})
-    if "country" in display.columns:
-        display = display.rename(columns={"country": "Country"})
-
-    # Apply formatting (skip non-numeric columns like country)
-    for col in display.columns:
-        if col not in ["Rk", "player", "team", "country", "Country"]:
-            display[col] = display[col].map(format_number)
+    display = display.rename(columns=DISPLAY_NAMES | {metric_col: pretty_name})
 
     return display
 
 
-def inject_opta_styles():
+def top_table_html(table: pd.DataFrame) -> str:
     """
-    Inject CSS to approximate the Opta Analyst Premier League stats table style:
-    - Clean white card background
-    - Bold blue header
-    - Subtle row separators and hover highlight
+    Render a top 10 table as a static, HTML-escaped <table>. The cards are
+    read-only, so a plain table is much lighter than an interactive grid.
     """
-    st.markdown(
-        """
-        <style>
-        /* Page background */
-        .main {
-            background-color: #0b1120;
+    table = table.assign(
+        **{
+            col: format_column(table[col])
+            for col in table.columns
+            if pd.api.types.is_numeric_dtype(table[col])
         }
+    )
 
-        /* Center column max width */
-        .block-container {
-            max-width: 1100px !important;
-            padding-top: 1.5rem !important;
-        }
+    return table.to_html(
+        index=False,
+        escape=True,
+        border=0,
+        justify="left",
+        classes="opta-card-table",
+    )
 
-        /* Card-like container for each table */
-        .opta-card {
-            background: #ffffff;
-            border-radius: 12px;
-            padding: 1rem 1.25rem;
-            box-shadow: 0 10px 30px rgba(15, 23, 42, 0.3);
-            margin-bottom: 1.5rem;
-        }
 
-        /* Title style similar to Opta headings */
-        .opta-title {
-            font-size: 1.1rem;
-            font-weight: 700;
-            color: #0f172a;
-            margin-bottom: 0.4rem;
-        }
+# Each entry is a filtered copy of the whole frame, so keep only the last
+# few filter states; slider drags would otherwise pile up one per position
+@st.cache_data(max_entries=8, ttl="1h")
+def filter_frame(
+    path: str,
+    min_minutes: int,
+    age_range: tuple[int, int],
+    nationality_filter: str,
+) -> pd.DataFrame:
+    """
+    Apply the sidebar filters to the loaded data. Cached per widget state, so
+    reruns that don't touch the filters skip the masking entirely.
+    """
+    df, age_col, _ = load_data(path)
 
-        .opta-subtitle {
-            font-size: 0.8rem;
-            font-weight: 500;
-            color: #64748b;
-            text-transform: uppercase;
-            letter-spacing: 0.08em;
-            margin-bottom: 0.4rem;
-        }
+    # Fuse all filters into one boolean mask and index the frame once
+    mask = np.ones(len(df), dtype=bool)
 
-        /* Dataframe header */
-        .opta-card table {
-            width: 100%;
-            border-collapse: collapse;
-            font-size: 0.86rem;
-        }
+    # Filter by minutes played if available
+    if "minutesPlayed" in df.columns and min_minutes > 0:
+        mask &= (df["minutesPlayed"] >= min_minutes).to_numpy()
 
-        .opta-card thead tr {
-            background: linear-gradient(90deg, #0f172a, #1d4ed8);
-        }
+    # Filter by age range (missing ages are excluded)
+    if age_col:
+        age_min_selected, age_max_selected = age_range
+        mask &= df[age_col].between(age_min_selected, age_max_selected).to_numpy()
+
+    # Filter by nationality, comparing integer category codes (-1 = missing)
+    # instead of strings
+    if "country" in df.columns and nationality_filter != "Tümü":
+        codes = df["country"].cat.codes.to_numpy()
+        categories = df["country"].cat.categories
+        if "Türkiye" in categories:
+            is_turkish = codes == categories.get_loc("Türkiye")
+        else:
+            is_turkish = np.zeros(len(df), dtype=bool)
 
-        .opta-card th {
-            color: #e5e7eb;
-            font-weight: 600;
-            padding: 0.5rem 0.75rem;
-            text-align: left;
-            border-bottom: 1px solid rgba(15, 23, 42, 0.3);
-            white-space: nowrap;
-        }
+        if nationality_filter == "Türk Oyuncular":
+            mask &= is_turkish
+        elif nationality_filter == "Yabancı Oyuncular":
+            mask &= ~is_turkish & (codes != -1)
 
-        .opta-card tbody tr:nth-child(even) {
-            background-color: #f9fafb;
-        }
+    return df[mask]
 
-        .opta-card tbody tr:nth-child(odd) {
-            background-color: #ffffff;
-        }
 
-        .opta-card tbody tr:hover {
-            background-color: #e5f0ff;
-        }
+def compute_all_tops(
+    df: pd.DataFrame,
+    metric_groups: dict[str, list[tuple[str, bool]]],
+    per_90: bool = False,
+    extra_cols: list[str] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Top 10 table for every metric in `metric_groups`, keyed by metric name.
+    All metric columns are ranked together in one pass over the numeric block.
+    """
+    metric_cols = {}
+    for group_metrics in metric_groups.values():
+        for metric, is_percentage in group_metrics:
+            if metric not in df.columns:
+                continue
+            metric_col = metric
+            if per_90 and not is_percentage and f"{metric}_per90" in df.columns:
+                metric_col = f"{metric}_per90"
+            metric_cols[metric] = metric_col
 
-        .opta-card td {
-            padding: 0.45rem 0.75rem;
-            border-bottom: 1px solid #e5e7eb;
-            color: #0f172a;
-        }
+    if not metric_cols:
+        return {}
 
-        .opta-card td:first-child {
-            font-weight: 600;
-            color: #6b7280;
-        }
+    block = df[list(metric_cols.values())].to_numpy(dtype=np.float32)
+    positions = top_positions(block, 10)
 
-        .opta-card td:nth-child(2) {
-            font-weight: 600;
-        }
+    return {
+        metric: build_top_table(df, metric, metric_col, positions[:, j], extra_cols)
+        for j, (metric, metric_col) in enumerate(metric_cols.items())
+    }
 
-        /* Strip default Streamlit dataframe overflow */
-        .opta-card .stDataFrame {
-            border-radius: 0;
-        }
 
-        /* Hide index column Streamlit sometimes injects */
-        .stDataFrame [data-testid="stTable"] tbody tr td:first-child {
-            padding-left: 0.25rem;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+# Entries are only a few dozen 10-row tables, so many more fit
+@st.cache_data(max_entries=64, ttl="1h")
+def top_tables(
+    path: str,
+    min_minutes: int,
+    age_range: tuple[int, int],
+    nationality_filter: str,
+    per_90: bool = False,
+    extra_cols: tuple[str, ...] = (),
+) -> dict[str, pd.DataFrame]:
+    """
+    Cached top 10 tables for all metrics. Keyed on the filter state rather
+    than the filtered frame itself, so toggling per 90 with unchanged filters
+    is a cache lookup instead of a re-filter and re-rank.
+    """
+    df = filter_frame(path, min_minutes, age_range, nationality_filter)
+    return compute_all_tops(df, METRIC_GROUPS, per_90, list(extra_cols) or None)
+
+
+# Static stylesheet approximating the Opta Analyst Premier League stats table:
+# clean white cards, bold blue header, subtle row separators and hover highlight
+OPTA_STYLES = """
+    <style>
+    /* Page background */
+    .main {
+        background-color: #0b1120;
+    }
+
+    /* Center column max width */
+    .block-container {
+        max-width: 1100px !important;
+        padding-top: 1.5rem !important;
+    }
+
+    /* Card-like container for each table */
+    .opta-card {
+        background: #ffffff;
+        border-radius: 12px;
+        padding: 1rem 1.25rem;
+        box-shadow: 0 10px 30px rgba(15, 23, 42, 0.3);
+        margin-bottom: 1.5rem;
+    }
+
+    /* Title style similar to Opta headings */
+    .opta-title {
+        font-size: 1.1rem;
+        font-weight: 700;
+        color: #0f172a;
+        margin-bottom: 0.4rem;
+    }
+
+    .opta-subtitle {
+        font-size: 0.8rem;
+        font-weight: 500;
+        color: #64748b;
+        text-transform: uppercase;
+        letter-spacing: 0.08em;
+        margin-bottom: 0.4rem;
+    }
+
+    /* Top 10 table inside each card */
+    .opta-card-table {
+        width: 100%;
+        border-collapse: collapse;
+        font-size: 0.86rem;
+    }
+
+    /* Clear the markdown renderer's default table borders; comes before the
+       th/td rules so their row separators still apply */
+    .opta-card-table,
+    .opta-card-table tr,
+    .opta-card-table th,
+    .opta-card-table td {
+        border: none;
+    }
+
+    .opta-card-table thead tr {
+        background: linear-gradient(90deg, #0f172a, #1d4ed8);
+    }
+
+    .opta-card-table th {
+        color: #e5e7eb;
+        font-weight: 600;
+        padding: 0.5rem 0.75rem;
+        text-align: left;
+        border-bottom: 1px solid rgba(15, 23, 42, 0.3);
+        white-space: nowrap;
+    }
+
+    .opta-card-table tbody tr:nth-child(even) {
+        background-color: #f9fafb;
+    }
+
+    .opta-card-table tbody tr:nth-child(odd) {
+        background-color: #ffffff;
+    }
+
+    .opta-card-table tbody tr:hover {
+        background-color: #e5f0ff;
+    }
+
+    .opta-card-table td {
+        padding: 0.45rem 0.75rem;
+        border-bottom: 1px solid #e5e7eb;
+        color: #0f172a;
+    }
+
+    .opta-card-table td:first-child {
+        font-weight: 600;
+        color: #6b7280;
+    }
+
+    .opta-card-table td:nth-child(2) {
+        font-weight: 600;
+    }
+    </style>
+    """
+
+
+def inject_opta_styles():
+    """
+    Inject the Opta-style CSS. The stylesheet is a module constant built once
+    per process; it still has to be emitted on every run, because Streamlit
+    drops elements a rerun doesn't re-render.
+    """
+    st.markdown(OPTA_STYLES, unsafe_allow_html=True)
 
 
 def main():
@@ -201,7 +409,8 @@ def main():
 
     inject_opta_styles()
 
-    df = load_data("tackles_joined.csv")
+    data_path = "tackles_joined.csv"
+    df, age_col, minutes_max = load_data(data_path)
 
     st.markdown(
         "<h2 style='color:#f9fafb; font-weight:700; margin-bottom:0.25rem;'>"
@@ -221,19 +430,11 @@ def main():
     min_minutes = st.sidebar.slider(
         "En az oynanan dakika",
         min_value=0,
-        max_value=int(df.get("minutesPlayed", pd.Series([0])).max() or 0),
+        max_value=minutes_max,
         value=300,
         step=90,
     )
     # Handle age range with proper defaults
-    age_col = None
-    if "age" in df.columns:
-        age_col = "age"
-    elif "age_x" in df.columns:
-        age_col = "age_x"
-    elif "age_y" in df.columns:
-        age_col = "age_y"
-    
     if age_col:
         age_series = df[age_col].dropna()
         if len(age_series) > 0:
@@ -266,46 +467,25 @@ def main():
     per90_default = True if "minutesPlayed" in df.columns else False
     per_90 = st.sidebar.checkbox("90 dakika bazında verileri göster", value=per90_default)
 
-    # Filter dataframe by age range
+    # Determine which age column exists and prepare extra columns
+    extra_cols = []
+    # Use the age_col determined earlier in the main function
     if age_col:
-        age_min_selected, age_max_selected = age_range
-        df = df[(df[age_col] >= age_min_selected) & (df[age_col] <= age_max_selected)]
-    
-    # Filter dataframe by nationality
+        extra_cols.append(age_col)
     if "country" in df.columns:
-        if nationality_filter == "Türk Oyuncular":
-            df = df[df["country"] == "Türkiye"]
-        elif nationality_filter == "Yabancı Oyuncular":
-            df = df[(df["country"] != "Türkiye") & (df["country"].notna())]
-
-    # Define metric groups inspired by Opta layouts
-    metric_groups = {
-        "Attacking": [
-            ("goals", False),
-            ("assists", False),
-            ("totalShots", False),
-            ("shotsOnTarget", False),
-            ("expectedGoals", False),
-        ],
-        "Possession & Passing": [
-            ("accuratePassesPercentage", True),
-            ("keyPasses", False),
-            ("accurateFinalThirdPasses", False),
-            ("accurateLongBallsPercentage", True),
-        ],
-        "Defending": [
-            ("tackles", False),
-            ("interceptions", False),
-            ("clearances", False),
-            ("groundDuelsWon", False),
-            ("groundDuelsWonPercentage", True),
-            ("totalDuelsWon", False),
-            ("totalDuelsWonPercentage", True),
-        ],
-    }
+        extra_cols.append("country")
+
+    tables = top_tables(
+        data_path,
+        min_minutes,
+        age_range,
+        nationality_filter,
+        per_90=per_90,
+        extra_cols=tuple(extra_cols),
+    )
 
     # Render one card per metric group
-    for group_name, group_metrics in metric_groups.items():
+    for group_name, group_metrics in METRIC_GROUPS.items():
         st.markdown(
             f"<div class='opta-subtitle'>{group_name.upper()}</div>",
             unsafe_allow_html=True,
@@ -313,27 +493,12 @@ def main():
 
         cols = st.columns(2)
 
-        for i, (metric, is_percentage) in enumerate(group_metrics):
-            if metric not in df.columns:
+        for i, (metric, _) in enumerate(group_metrics):
+            if metric not in tables:
                 continue
 
             with cols[i % 2]:
-                # Determine which age column exists and prepare extra columns
-                extra_cols = []
-                # Use the age_col determined earlier in the main function
-                if age_col:
-                    extra_cols.append(age_col)
-                if "country" in df.columns:
-                    extra_cols.append("country")
-                
-                table = build_top_table(
-                    df=df,
-                    metric=metric,
-                    per_90=per_90 and not is_percentage,
-                    min_minutes=min_minutes,
-                    ascending=False,
-                    extra_cols=extra_cols if extra_cols else None,
-                )
+                table = tables[metric]
 
                 metric_label = metric.replace("Percentage", " %").replace("_", " ").title()
                 subtitle = f"Top 10 · {metric_label}"
@@ -341,18 +506,12 @@ def main():
                 st.markdown(
                     "<div class='opta-card'>"
                     f"<div class='opta-title'>{metric_label}</div>"
-                    f"<div style='font-size:0.75rem; color:#6b7280; margin-bottom:0.5rem;'>{subtitle}</div>",
+                    f"<div style='font-size:0.75rem; color:#6b7280; margin-bottom:0.5rem;'>{subtitle}</div>"
+                    f"{top_table_html(table)}"
+                    "</div>",
                     unsafe_allow_html=True,
                 )
 
-                st.dataframe(
-                    table,
-                    use_container_width=True,
-                    hide_index=True,
-                )
-
-                st.markdown("</div>", unsafe_allow_html=True)
-
 
 if __name__ == "__main__":
     main()
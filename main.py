@@ -1,7 +1,11 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import ScraperFC as sfc  # LEAVE THIS!
 import pandas as pd
 
+from stats_io import detect_age_col, read_stats
+
 
 def get_top_tacklers_super_lig(
     season: str = "25/26",
@@ -13,7 +17,8 @@ def get_top_tacklers_super_lig(
     Get top tacklers in the Turkish Super Lig.
 
     Preferred path:
-      - Load from local CSV (`tackles_joined.csv`) which you already generated.
+      - Load from local CSV (`tackles_joined.csv`) which you already generated,
+        via its Parquet copy (`tackles_joined.parquet`, written on first load).
     Fallback:
       - Use ScraperFC's Sofascore scraper (may fail if Sofascore API changes or blocks scraping,
         which is what causes the `KeyError: 'seasons'` you saw).
@@ -22,16 +27,11 @@ def get_top_tacklers_super_lig(
 
     # --- Fast path: use local joined data if available ---
     if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
+        # Plain dtypes, as pd.read_csv would give them
+        df = read_stats(csv_path, compact=False)
 
         # Choose an age column if present
-        age_col = None
-        if "age" in df.columns:
-            age_col = "age"
-        elif "age_x" in df.columns:
-            age_col = "age_x"
-        elif "age_y" in df.columns:
-            age_col = "age_y"
+        age_col = detect_age_col(df)
 
         # Optional age filtering
         if age_col is not None:
@@ -40,11 +40,10 @@ def get_top_tacklers_super_lig(
             if max_age is not None:
                 df = df[(df[age_col] <= max_age) | (df[age_col].isna())]
 
-        # Sort & take top N
-        df = df.dropna(subset=["tackles"])
+        # Take top N (partial sort, no full sort of the table)
         top = (
-            df.sort_values("tackles", ascending=False)
-            .head(top_n)
+            df.dropna(subset=["tackles"])
+            .nlargest(top_n, "tackles")
             .reset_index(drop=True)
         )
 
@@ -82,22 +81,28 @@ def get_top_tacklers_super_lig(
         subset=["tackles"]
     )
 
-    # Fetch extra player info
+    # Fetch extra player info; requests are network-bound, so overlap them
     player_info: list[dict] = []
-    for player in df["player"].unique():
-        try:
-            info = ss.scrape_player_info(player)
-            player_info.append(
-                {
-                    "player": player,
-                    "age": info.get("age"),
-                    "position": info.get("position"),
-                    "nationality": info.get("nationality"),
-                }
-            )
-        except Exception:
-            # Player page not found or ambiguous name; skip
-            continue
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        futures = {
+            ex.submit(ss.scrape_player_info, player): player
+            for player in df["player"].unique()
+        }
+        for future in as_completed(futures):
+            player = futures[future]
+            try:
+                info = future.result()
+                player_info.append(
+                    {
+                        "player": player,
+                        "age": info.get("age"),
+                        "position": info.get("position"),
+                        "nationality": info.get("nationality"),
+                    }
+                )
+            except Exception:
+                # Player page not found or ambiguous name; skip
+                continue
 
     player_info_df = pd.DataFrame(player_info)
 
@@ -114,11 +119,7 @@ def get_top_tacklers_super_lig(
     if max_age is not None:
         df = df[(df["age"] <= max_age) | (df["age"].isna())]
 
-    top = (
-        df.sort_values("tackles", ascending=False)
-        .head(top_n)
-        .reset_index(drop=True)
-    )
+    top = df.nlargest(top_n, "tackles").reset_index(drop=True)
 
     return top[["player", "team", "age", "tackles", "position", "nationality"]]
 
@@ -0,0 +1,276 @@
+import csv
+import os
+import tempfile
+from collections.abc import Collection
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+# Columns that hold text; everything else in the stats CSV is expected to be
+# numeric, and its type is inferred by the parser
+TEXT_COLS = ["player", "team", "country"]
+
+# Text columns with few distinct values, handed out dictionary-encoded (pandas
+# categories); player names are near-unique, so they stay plain text
+CATEGORY_COLS = ["team", "country"]
+
+NULL_VALUES = ["", "NA"]
+
+# Narrowest first, as pd.to_numeric(downcast="integer") picks them
+_INT_TYPES = [pa.int8(), pa.int16(), pa.int32(), pa.int64()]
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+_FLOAT32_EXACT_INT = 2**24
+
+
+def _compact_column(name: str, col: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Shrink one column based on its values: the narrowest integer type that
+    holds its min/max, float32 for floats within float32 range, and
+    dictionary encoding for the category columns. All-empty columns become
+    float32 NaN rather than an object column of None.
+    """
+    typ = col.type
+    if pa.types.is_null(typ):
+        return col.cast(pa.float32())
+    if pa.types.is_integer(typ):
+        if col.null_count:
+            # pandas turns it into floats anyway; float32 only while every
+            # value stays exact
+            return col.cast(pa.float32() if _fits(col, _FLOAT32_EXACT_INT) else pa.float64())
+        bounds = pc.min_max(col)
+        lo, hi = bounds["min"].as_py(), bounds["max"].as_py()
+        if lo is None:
+            return col
+        for int_type in _INT_TYPES:
+            info = np.iinfo(int_type.to_pandas_dtype())
+            if info.min <= lo and hi <= info.max:
+                return col.cast(int_type)
+        return col
+    if pa.types.is_floating(typ):
+        return col.cast(pa.float32()) if _fits(col, _FLOAT32_MAX) else col
+    if name in CATEGORY_COLS and pa.types.is_string(typ):
+        return col.dictionary_encode()
+    return col
+
+
+def _fits(col: pa.ChunkedArray, limit: float) -> bool:
+    largest = pc.max(pc.abs(pc.cast(col, pa.float64()))).as_py()
+    return largest is None or largest <= limit
+
+
+def compact_table(table: pa.Table) -> pa.Table:
+    """Apply `_compact_column` to every column of `table`."""
+    return pa.table(
+        {name: _compact_column(name, table.column(name)) for name in table.column_names}
+    )
+
+
+def _read_header(path: str) -> list[str]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+
+def _csv_dataset(path: str, column_types: dict[str, pa.DataType]) -> ds.Dataset:
+    convert_options = pv.ConvertOptions(
+        column_types=column_types,
+        null_values=NULL_VALUES,
+        strings_can_be_null=True,
+    )
+    return ds.dataset(path, format=ds.CsvFileFormat(convert_options=convert_options))
+
+
+def stats_dataset(path: str) -> ds.Dataset | None:
+    """
+    Arrow dataset over the stats CSV, so scans stream in batches. Only the
+    known text columns get explicit types; the rest are inferred.
+
+    Returns None if a non-text column was inferred as text (a stray value such
+    as "-" in a numeric column, or an extra text column), in which case the
+    caller should fall back to `read_coerced_csv`.
+    """
+    header = _read_header(path)
+    column_types = {col: pa.string() for col in header if col in TEXT_COLS}
+    dataset = _csv_dataset(path, column_types)
+
+    # A column that is empty in the first block is inferred as null; give it
+    # a float type so values in later blocks still parse
+    null_cols = {f.name: pa.float64() for f in dataset.schema if pa.types.is_null(f.type)}
+    if null_cols:
+        dataset = _csv_dataset(path, column_types | null_cols)
+
+    for field in dataset.schema:
+        if field.name not in TEXT_COLS and pa.types.is_string(field.type):
+            return None
+    return dataset
+
+
+def read_coerced_csv(path: str) -> pa.Table:
+    """
+    Slow path for CSVs the typed scan can't handle: read every column as text
+    and coerce it like pd.to_numeric(errors="coerce"), so unparsable cells
+    become missing values. Columns where nothing parses are kept as text.
+    """
+    header = _read_header(path)
+    convert_options = pv.ConvertOptions(
+        column_types={col: pa.string() for col in header},
+        null_values=NULL_VALUES,
+        strings_can_be_null=True,
+    )
+    df = pv.read_csv(path, convert_options=convert_options).to_pandas()
+
+    for col in df.columns:
+        if col in TEXT_COLS:
+            continue
+        numeric = pd.to_numeric(df[col], errors="coerce")
+        if numeric.notna().any() or df[col].isna().all():
+            df[col] = numeric
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _to_pandas(table: pa.Table, compact: bool) -> pd.DataFrame:
+    # Compact after projection, so only the columns handed out are scanned
+    if compact:
+        table = compact_table(table)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def _project(schema: pa.Schema, columns: Collection[str] | None) -> list[str] | None:
+    if columns is None:
+        return None
+    return [c for c in schema.names if c in columns]
+
+
+def read_stats_csv(
+    path: str, columns: Collection[str] | None = None, compact: bool = True
+) -> pd.DataFrame:
+    """Read the stats CSV directly, converting only `columns` if given."""
+    dataset = stats_dataset(path)
+    if dataset is not None:
+        try:
+            table = dataset.to_table(columns=_project(dataset.schema, columns))
+            return _to_pandas(table, compact)
+        except pa.ArrowInvalid:
+            # A later block didn't match the types inferred from the first
+            pass
+
+    table = read_coerced_csv(path)
+    if columns is not None:
+        table = table.select(_project(table.schema, columns))
+    return _to_pandas(table, compact)
+
+
+def detect_age_col(df: pd.DataFrame) -> str | None:
+    """Name of the age column in `df` (joins may leave it suffixed), if any."""
+    for col in ["age", "age_x", "age_y"]:
+        if col in df.columns:
+            return col
+    return None
+
+
+def parquet_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+# Stored in the Parquet schema metadata; bump it whenever the way the copy is
+# written changes, so copies left by an older version get rewritten
+PARQUET_VERSION_KEY = b"stats_io.version"
+PARQUET_VERSION = b"2"
+
+
+def _with_version(schema: pa.Schema) -> pa.Schema:
+    metadata = (schema.metadata or {}) | {PARQUET_VERSION_KEY: PARQUET_VERSION}
+    return schema.with_metadata(metadata)
+
+
+def parquet_is_current(csv_path: str, pq_path: str) -> bool:
+    """
+    Whether the Parquet copy can be used as-is: it exists, is no older than
+    the CSV and was written by this version of the loader.
+    """
+    if not os.path.exists(pq_path):
+        return False
+    if os.path.exists(csv_path) and os.path.getmtime(pq_path) < os.path.getmtime(csv_path):
+        return False
+    try:
+        metadata = pq.read_schema(pq_path).metadata or {}
+    except pa.ArrowInvalid:
+        # Not a readable Parquet file
+        return False
+    return metadata.get(PARQUET_VERSION_KEY) == PARQUET_VERSION
+
+
+def _write_parquet_file(csv_path: str, out_path: str) -> None:
+    # The Parquet copy keeps the parsed types as-is (int64/float64/string);
+    # compaction happens when a table is handed out, once its values are known
+    dataset = stats_dataset(csv_path)
+    if dataset is not None:
+        try:
+            schema = _with_version(dataset.schema)
+            with pq.ParquetWriter(out_path, schema, compression="snappy") as writer:
+                for batch in dataset.to_batches():
+                    writer.write_batch(batch)
+            return
+        except pa.ArrowInvalid:
+            # A later block didn't match the types inferred from the first
+            pass
+
+    table = read_coerced_csv(csv_path)
+    table = table.replace_schema_metadata(_with_version(table.schema).metadata)
+    pq.write_table(table, out_path, compression="snappy")
+
+
+def write_parquet(csv_path: str, pq_path: str) -> None:
+    """
+    Convert the CSV to Parquet batch by batch, so peak memory stays bounded
+    by the scan batch size rather than the size of the file. CSVs with
+    unparsable numeric cells go through `read_coerced_csv` in one piece.
+    """
+    # Write to a uniquely named temp file in the same directory and swap it
+    # in, so concurrent writers don't share a file and readers never see a
+    # half-written Parquet file
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(pq_path) or ".", suffix=".parquet.tmp"
+    )
+    os.close(fd)
+    try:
+        _write_parquet_file(csv_path, tmp_path)
+        os.replace(tmp_path, pq_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_stats(
+    csv_path: str, columns: Collection[str] | None = None, compact: bool = True
+) -> pd.DataFrame:
+    """
+    Load the stats table, preferring a Parquet copy next to the CSV.
+
+    The Parquet file is (re)written from the CSV whenever it is missing,
+    older than the CSV or written by an older version of this loader, so
+    edits to the CSV are picked up on the next load.
+    If `columns` is given, only those columns (where present) are returned;
+    the rest are never read from disk.
+
+    By default columns are narrowed to the smallest types that hold their
+    values (see `compact_table`); with `compact=False` they keep the types
+    pd.read_csv would give them.
+    """
+    pq_path = parquet_path(csv_path)
+    if not parquet_is_current(csv_path, pq_path):
+        try:
+            write_parquet(csv_path, pq_path)
+        except OSError:
+            # Read-only checkout: keep serving from the CSV
+            return read_stats_csv(csv_path, columns, compact)
+
+    dataset = ds.dataset(pq_path, format="parquet")
+    table = dataset.to_table(columns=_project(dataset.schema, columns))
+    return _to_pandas(table, compact)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import dashboard
+
+
+def test_top_positions_ties_keep_row_order_and_nan_ranks_last():
+    block = np.array(
+        [[1.0], [3.0], [np.nan], [3.0], [2.0], [3.0]],
+        dtype=np.float32,
+    )
+    expected = np.array([[1], [3], [5], [4], [0], [2]])
+
+    np.testing.assert_array_equal(dashboard._top_positions_numpy(block, 6), expected)
+    np.testing.assert_array_equal(dashboard.top_positions(block, 10), expected)
+
+
+@pytest.mark.skipif(dashboard._topk_cols is None, reason="numba not installed")
+def test_numba_and_numpy_paths_agree():
+    rng = np.random.default_rng(0)
+    for n in [1, 5, 10, 11, 50, 500]:
+        # Few distinct values, so ties straddle the top 10 cutoff
+        block = rng.integers(0, 6, size=(n, 8)).astype(np.float32)
+        block[rng.random(block.shape) < 0.2] = np.nan
+        k = min(10, n)
+
+        np.testing.assert_array_equal(
+            dashboard._topk_cols(block, k),
+            dashboard._top_positions_numpy(block, k),
+        )
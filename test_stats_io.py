@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import stats_io
+
+
+def write_csv(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_clean_csv_gets_compact_types(tmp_path):
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,age,minutesPlayed,tackles,rating\n"
+        "A,Alpha,21,900,12,7.1\n"
+        "B,Beta,30,2500,40,6.8\n"
+        "C,Alpha,,1800,7,\n",
+    )
+
+    df = stats_io.read_stats(csv_path)
+
+    assert df["player"].tolist() == ["A", "B", "C"]
+    assert isinstance(df["team"].dtype, pd.CategoricalDtype)
+    assert df["minutesPlayed"].dtype == np.int16
+    assert df["tackles"].dtype == np.int8
+    assert df["rating"].dtype == np.float32
+    # Integers with gaps come back as floats, as pandas would read them
+    assert df["age"].dtype == np.float32
+    assert np.isnan(df["age"].iloc[2])
+
+
+def test_stray_dash_becomes_missing(tmp_path):
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,tackles\nA,Alpha,3\nB,Beta,-\nC,Alpha,5\n",
+    )
+
+    df = stats_io.read_stats(csv_path)
+
+    assert df["tackles"].iloc[[0, 2]].tolist() == [3, 5]
+    assert np.isnan(df["tackles"].iloc[1])
+
+
+def test_extra_text_column_is_kept_as_text(tmp_path):
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,position,tackles\nA,Alpha,DF,3\nB,Beta,MF,4\n",
+    )
+
+    df = stats_io.read_stats(csv_path)
+
+    assert df["position"].tolist() == ["DF", "MF"]
+    assert df["tackles"].tolist() == [3, 4]
+
+
+@pytest.mark.parametrize("dirty", [False, True])
+def test_large_ints_keep_their_values(tmp_path, dirty):
+    # The dirty variant goes through the coerced fallback
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,marketValue,tackles\n"
+        f"A,Alpha,5000000000,{'-' if dirty else 1}\n"
+        "B,Beta,3000000001,2\n",
+    )
+
+    df = stats_io.read_stats(csv_path)
+
+    assert df["marketValue"].dtype == np.int64
+    assert df["marketValue"].tolist() == [5_000_000_000, 3_000_000_001]
+
+
+def test_all_empty_column_is_float(tmp_path):
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,saves\nA,Alpha,\nB,Beta,\n",
+    )
+
+    df = stats_io.read_stats(csv_path)
+
+    assert df["saves"].dtype == np.float32
+    assert df["saves"].isna().all()
+
+
+def test_late_block_mismatch_falls_back(tmp_path):
+    # Far past the first parse block, so the type is inferred as integer first
+    rows = [f"P{i},Alpha,{i % 50}" for i in range(200_000)]
+    rows.append("Late,Beta,-")
+    csv_path = write_csv(
+        tmp_path / "stats.csv", "player,team,tackles\n" + "\n".join(rows) + "\n"
+    )
+
+    df = stats_io.read_stats_csv(csv_path)
+
+    assert len(df) == 200_001
+    assert df["tackles"].iloc[:3].tolist() == [0, 1, 2]
+    assert np.isnan(df["tackles"].iloc[-1])
+    assert stats_io.read_stats(csv_path)["tackles"].equals(df["tackles"])
+
+
+def test_columns_are_projected(tmp_path):
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,tackles,rating\nA,Alpha,3,7.0\n",
+    )
+
+    for read in [stats_io.read_stats, stats_io.read_stats_csv]:
+        df = read(csv_path, columns={"player", "tackles", "missing"})
+        assert list(df.columns) == ["player", "tackles"]
+
+
+def test_stale_parquet_copy_is_rewritten(tmp_path):
+    csv_path = write_csv(tmp_path / "stats.csv", "player,team,tackles\nA,Alpha,3\n")
+    assert stats_io.read_stats(csv_path)["tackles"].tolist() == [3]
+    pq_path = stats_io.parquet_path(csv_path)
+    assert os.path.exists(pq_path)
+
+    write_csv(tmp_path / "stats.csv", "player,team,tackles\nA,Alpha,9\n")
+    mtime = os.path.getmtime(pq_path) + 10
+    os.utime(csv_path, (mtime, mtime))
+
+    assert stats_io.read_stats(csv_path)["tackles"].tolist() == [9]
+
+
+def test_parquet_copy_from_older_loader_is_rewritten(tmp_path):
+    csv_path = write_csv(tmp_path / "stats.csv", "player,team,tackles\nA,Alpha,3\n")
+    pq_path = stats_io.parquet_path(csv_path)
+    # Newer than the CSV, but written without the version tag
+    pd.DataFrame({"player": ["A"], "tackles": [-1]}).to_parquet(pq_path)
+
+    assert not stats_io.parquet_is_current(csv_path, pq_path)
+    assert stats_io.read_stats(csv_path)["tackles"].tolist() == [3]
+    assert stats_io.parquet_is_current(csv_path, pq_path)
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    csv_path = write_csv(tmp_path / "stats.csv", "player,team,tackles\nA,Alpha,3\n")
+
+    def fail(csv_path, out_path):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(stats_io, "_write_parquet_file", fail)
+    with pytest.raises(ValueError):
+        stats_io.write_parquet(csv_path, stats_io.parquet_path(csv_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["stats.csv"]
+
+
+def test_compact_false_matches_read_csv(tmp_path):
+    csv_path = write_csv(
+        tmp_path / "stats.csv",
+        "player,team,age,tackles,rating\nA,Alpha,21,12,7.1\nB,Beta,,40,6.8\n",
+    )
+
+    df = stats_io.read_stats(csv_path, compact=False)
+
+    pd.testing.assert_series_equal(df.dtypes, pd.read_csv(csv_path).dtypes)